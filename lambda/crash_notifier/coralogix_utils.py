@@ -7,8 +7,133 @@ import os
 import json
 import requests
 import urllib.parse
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
 
+# Prefer orjson for response parsing (~5x faster than stdlib json on the
+# MB-scale archive responses); fall back to stdlib if the layer lacks it.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Module-scope session so warm Lambda invocations reuse the TLS connection
+# to the Coralogix API instead of re-handshaking on every crash event.
+_session = requests.Session()
+
+# Per-log debug printing is expensive (json.dumps per entry + CloudWatch
+# ingestion is billed per byte) — only emit it when explicitly requested.
+_DEBUG = os.environ.get('LOG_LEVEL', 'INFO').upper() == 'DEBUG'
+
+# Coralogix configuration never changes within a Lambda container, so read it
+# once at import instead of re-walking the environment on every crash event.
+_CORALOGIX_ENABLED = (
+    os.environ.get('ENABLE_CORALOGIX_INTEGRATION', '').lower() == 'true'
+    and bool(os.environ.get('CORALOGIX_API_KEY'))
+    and bool(os.environ.get('CORALOGIX_REGION'))
+    and bool(os.environ.get('CORALOGIX_ACCOUNT'))
+)
+
+
+def _parse_cx_ts(timestamp_str: str) -> str:
+    """
+    Truncate Coralogix nanosecond fractional seconds to microseconds so
+    datetime.fromisoformat accepts them (e.g. "2025-09-21T09:59:32.100026178"
+    has 9 fractional digits; fromisoformat only handles up to 6 before 3.11).
+    """
+    dot = timestamp_str.find('.')
+    if dot < 0:
+        return timestamp_str
+    # Find the end of the fractional digits (there may be a tz suffix after)
+    end = dot + 1
+    while end < len(timestamp_str) and timestamp_str[end].isdigit():
+        end += 1
+    if end - dot - 1 <= 6:
+        return timestamp_str
+    return timestamp_str[:dot + 7] + timestamp_str[end:]
+
+
+# Characters that would change meaning under DataPrime's regex match operator
+_REGEX_METACHARS = set('.^$*+?{}[]|()\\')
+
+
+def _filter_op(value: str) -> str:
+    """
+    Pick the filter operator for a value: '==' (a plain byte compare the
+    server can prune on) unless the value contains regex metacharacters, in
+    which case keep the historical '~' regex match.
+    """
+    return '~' if _REGEX_METACHARS.intersection(value) else '=='
+
+
+def _build_dataprime_query(service_name: str, task_arn: str, logs_limit: int, timebox: str = '') -> str:
+    """
+    Build the DataPrime query shared by the API call and the UI link,
+    escaping single quotes so service names can't break the filter syntax.
+    """
+    svc = service_name.replace("'", "\\'")
+    arn = task_arn.replace("'", "\\'")
+    prefix = f"source logs {timebox}".rstrip()
+    return (
+        f"{prefix} | filter $l.subsystemname {_filter_op(svc)} '{svc}' "
+        f"| filter $d.ecs_task_arn {_filter_op(arn)} '{arn}' | limit {logs_limit}"
+    )
+
+
+def _convert_log(log: Dict[str, Any], now_ms: int, stats: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Convert a single Coralogix result row into the CloudWatch-style
+    {'timestamp': ms, 'message': str} shape the rest of the system expects.
+
+    Tallies into `stats` instead of printing per row; the caller emits one
+    summary line for the whole batch.
+    """
+    if _DEBUG:
+        print(f"📋 Full log entry: {json.dumps(log, indent=2)[:500]}...")
+
+    # Coralogix guarantees 'data' is already structured when present, so the
+    # userData JSON parse only runs on the fallback path.
+    data = log.get('data')
+    if data:
+        # Try message, then log, then the whole entry
+        msg = data.get('message') or data.get('log') or data
+        stats['from_data'] += 1
+    else:
+        user_data = log.get('userData')
+        try:
+            parsed_data = _loads(user_data or '{}')
+            msg = parsed_data.get('message') or parsed_data.get('log') or parsed_data
+            stats['from_userdata'] += 1
+        except (ValueError, TypeError) as e:
+            if _DEBUG:
+                print(f"⚠️ Failed to parse userData as JSON: {e}")
+            # Use the raw userData or the whole log entry
+            msg = user_data if user_data else log
+            stats['userdata_parse_fail'] += 1
+    # Avoid copying strings that are already strings
+    message = msg if isinstance(msg, str) else str(msg)
+
+    # Extract timestamp from metadata (as shown in proof of concept)
+    timestamp_str = next(
+        (m.get('value') for m in log.get('metadata', ()) if m.get('key') == 'timestamp'),
+        None,
+    )
+
+    # Convert timestamp to milliseconds (CloudWatch format)
+    timestamp_ms = now_ms
+    if timestamp_str:
+        try:
+            # Handle timestamp format like: "2025-09-21T09:59:32.100026178"
+            dt = datetime.fromisoformat(_parse_cx_ts(timestamp_str).replace('Z', '+00:00'))
+            timestamp_ms = int(dt.timestamp() * 1000)
+        except ValueError:
+            stats['ts_fail'] += 1
+    else:
+        stats['ts_fail'] += 1
+
+    return {'timestamp': timestamp_ms, 'message': message}
+
 
 def get_coralogix_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -34,150 +159,92 @@ def get_coralogix_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         crash_info['log_source'] = 'coralogix'
 
         logs_limit = 50
-        query = f"source logs last 1h | filter $l.subsystemname ~ '{crash_info['service_name']}' | filter $d.ecs_task_arn ~ '{task_arn}' | limit {logs_limit}"
+        # Narrow the query window around the crash instead of scanning a fixed
+        # hour — the task's startedAt bounds when relevant logs can exist, and
+        # time range is the dominant server-side cost factor.
+        timebox = "last 1h"
+        started_at = crash_info.get('started_at', '')
+        if started_at:
+            try:
+                started = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
+                window_start = (started - timedelta(minutes=5)).astimezone(timezone.utc)
+                window_end = datetime.now(timezone.utc) + timedelta(minutes=1)
+                timebox = (
+                    f"between {window_start.strftime('%Y-%m-%dT%H:%M:%SZ')} "
+                    f"and {window_end.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+                )
+            except ValueError:
+                pass
+
+        query = _build_dataprime_query(crash_info['service_name'], task_arn, logs_limit, timebox)
         print(f"🔍 Coralogix query: {query}")
-        print(f"🔍 Task ARN being searched: {task_arn}")
-        
-        # Also try a broader query to see what fields are available
-        debug_query = f"source logs last 1h | limit 5"
-        print(f"🐛 DEBUG: Will also test broader query to see field structure: {debug_query}")
-        
+
         # Make the API request
         url = f"https://api.{region}.coralogix.com/api/v1/dataprime/query"
         headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {api_key}'
         }
-        payload = {
-            "query": query,
-            "metadata": {"tier": "TIER_ARCHIVE"}
-        }
-        
+
         print(f"📡 Making Coralogix API request to: {url}")
-        print(f"🔎 Query: {query}")
-        
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        # Parse the streaming response - Coralogix returns multiple JSON objects separated by newlines
-        response_text = response.text.strip()
-        
-        # Split by newlines and parse each JSON object
-        response_lines = [line.strip() for line in response_text.split('\n') if line.strip()]
-        
-        # Look for the result object (usually the second line)
+
+        # Try the frequent-search tier first (fast path for recent logs) and
+        # only fall back to the slow archive scan when it returns nothing.
         logs = []
-        for i, line in enumerate(response_lines):
-            try:
-                line_data = json.loads(line)
-                print(f"📄 Line {i+1} keys: {line_data.keys()}")
-                
-                # Check if this line contains the results
-                if 'result' in line_data and 'results' in line_data['result']:
-                    current_logs = line_data['result']['results']
-                    print(f"✅ Found results in line {i+1}: {len(current_logs)} log entries")                    
-                    # Extend logs instead of replacing - there might be multiple result lines
-                    logs.extend(current_logs)
-                    print(f"📊 Total logs collected so far: {len(logs)}")
-                    print(f"📊 First few log entry keys: {[list(log.keys()) for log in logs[:3]]}")
-                    # DON'T break - continue processing all result lines
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Failed to parse line {i+1}: {e}")
-                continue
-        
+        for tier in ('TIER_FREQUENT_SEARCH', 'TIER_ARCHIVE'):
+            payload = {
+                "query": query,
+                "metadata": {"tier": tier}
+            }
+            response = _session.post(url, headers=headers, json=payload, timeout=30, stream=True)
+            response.raise_for_status()
+
+            # Parse the streaming response - Coralogix returns multiple JSON objects
+            # separated by newlines. Iterate the body instead of materializing the
+            # whole text and a duplicate list of lines (archive results can be MBs).
+            for i, raw_line in enumerate(response.iter_lines()):
+                if not raw_line:
+                    continue
+                try:
+                    line_data = _loads(raw_line)
+                    if _DEBUG:
+                        print(f"📄 Line {i+1} keys: {line_data.keys()}")
+
+                    # Check if this line contains the results
+                    if 'result' in line_data and 'results' in line_data['result']:
+                        current_logs = line_data['result']['results']
+                        # Extend logs instead of replacing - there might be multiple result lines
+                        logs.extend(current_logs)
+                        if _DEBUG:
+                            print(f"✅ Found results in line {i+1}: {len(current_logs)} log entries")
+                            print(f"📊 Total logs collected so far: {len(logs)}")
+                        # DON'T break - continue processing all result lines
+                except ValueError as e:
+                    print(f"⚠️ Failed to parse line {i+1}: {e}")
+                    continue
+
+            if logs:
+                break
+            print(f"⚠️ No results from {tier}")
+
         if not logs:
             print("⚠️ No results found in any response line")
             return []
         
         print(f"🎯 Final total logs collected: {len(logs)}")
-        if logs:
+        if _DEBUG and logs:
             print(f"🔍 First few log entry keys: {list(logs[0].keys())[:10] if logs[0] else 'empty'}")
         
-        # Convert to the format expected by the rest of the system
-        log_entries = []
-        for i, log in enumerate(logs):
-            print(f"🔍 Processing log entry {i+1}: keys = {list(log.keys())}")
-            
-            # Now we have the full log entry, not just selected fields
-            # Let's see what structure we actually have
-            user_data = log.get('userData', '{}')
-            message = 'No message'
-            
-            # Print the full log structure for debugging
-            print(f"📋 Full log entry {i+1}: {json.dumps(log, indent=2)[:500]}...")
-            
-            # Try to get the full log data structure
-            log_data = log.get('data', {})
-            if log_data:
-                # If we have structured data, try message, then log, then whole entry
-                extracted_message = log_data.get('message')
-                extracted_log = log_data.get('log')
-                
-                if extracted_message is not None and extracted_message != '':
-                    message = str(extracted_message)
-                    print(f"📝 Using 'data.message' field: '{message}'")
-                elif extracted_log is not None and extracted_log != '':
-                    message = str(extracted_log)
-                    print(f"📝 Message null/empty, using 'data.log' field: '{message}'")
-                else:
-                    message = str(log_data)
-                    print(f"📝 Using whole data entry: '{message}'")
-            else:
-                # Fallback to userData parsing
-                try:
-                    parsed_data = json.loads(user_data)
-                    extracted_message = parsed_data.get('message')
-                    extracted_log = parsed_data.get('log')
-                    
-                    if extracted_message is not None and extracted_message != '':
-                        message = str(extracted_message)
-                        print(f"📝 Using userData 'message' field: '{message}'")
-                    elif extracted_log is not None and extracted_log != '':
-                        message = str(extracted_log)
-                        print(f"📝 Message null/empty, using userData 'log' field: '{message}'")
-                    else:
-                        message = str(parsed_data)
-                        print(f"📝 Using whole userData entry: '{message}'")
-                        
-                except (json.JSONDecodeError, TypeError) as e:
-                    print(f"⚠️ Failed to parse userData as JSON: {e}")
-                    print(f"⚠️ Raw userData: {user_data}")
-                    print(f"⚠️ Full log entry keys: {log.keys()}")
-                    # Use the raw userData or the whole log entry
-                    message = str(user_data) if user_data else str(log)
-            
-            # Extract timestamp from metadata (as shown in proof of concept)
-            timestamp_str = None
-            for meta in log.get('metadata', []):
-                if meta.get('key') == 'timestamp':
-                    timestamp_str = meta.get('value')
-                    break
-            
-            # Convert timestamp to milliseconds (CloudWatch format)
-            timestamp_ms = 0
-            if timestamp_str:
-                try:
-                    from datetime import datetime
-                    # Handle timestamp format like: "2025-09-21T09:59:32.100026178"
-                    dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                    timestamp_ms = int(dt.timestamp() * 1000)
-                    print(f"📅 Parsed timestamp: {timestamp_str} -> {timestamp_ms}")
-                except Exception as ts_error:
-                    print(f"⚠️ Error parsing timestamp {timestamp_str}: {ts_error}")
-                    # Use current time as fallback
-                    timestamp_ms = int(datetime.now().timestamp() * 1000)
-            else:
-                print(f"⚠️ No timestamp found in metadata")
-                # Use current time as fallback
-                from datetime import datetime
-                timestamp_ms = int(datetime.now().timestamp() * 1000)
-            
-            log_entries.append({
-                'timestamp': timestamp_ms,
-                'message': message
-            })
-            
-        print(f"🔄 Processed {len(log_entries)} log entries from Coralogix")
+        # Convert to the format expected by the rest of the system.
+        # Compute the fallback timestamp once and bind the helper locally so
+        # the per-row work is a single call in a list comprehension.
+        now_ms = int(datetime.now().timestamp() * 1000)
+        stats = {'from_data': 0, 'from_userdata': 0, 'userdata_parse_fail': 0, 'ts_fail': 0}
+        _conv = _convert_log
+        log_entries = [_conv(log, now_ms, stats) for log in logs]
+
+        # One summary line for the whole batch instead of several per entry
+        print(f"🔄 Coralogix conversion: {json.dumps({'total': len(log_entries), **stats})}")
         
         # Sort by timestamp (newest first)
         log_entries.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -211,8 +278,9 @@ def generate_coralogix_ui_link(crash_info: Dict[str, Any], logs_limit: int = 50)
             print("❌ No task ARN available for UI link generation")
             return None
         
-        # Build the DataPrime query (same as API query)
-        query = f"source logs  | filter $l.subsystemname ~ '{crash_info['service_name']}' | filter $d.ecs_task_arn ~ '{task_arn}' | limit {logs_limit}"
+        # Build the DataPrime query (same shape as the API query, no timebox —
+        # the UI link carries its own time range parameter)
+        query = _build_dataprime_query(crash_info['service_name'], task_arn, logs_limit)
         
         # URL encode the query
         encoded_query = urllib.parse.quote(query)
@@ -231,33 +299,4 @@ def generate_coralogix_ui_link(crash_info: Dict[str, Any], logs_limit: int = 50)
 
 def is_coralogix_enabled() -> bool:
     """Check if Coralogix integration is enabled and properly configured."""
-    api_key = os.environ.get('CORALOGIX_API_KEY')
-    region = os.environ.get('CORALOGIX_REGION')
-    account = os.environ.get('CORALOGIX_ACCOUNT')
-    enabled = os.environ.get('ENABLE_CORALOGIX_INTEGRATION', '').lower() == 'true'
-    
-    print(f"🐛 DEBUG Coralogix config: enabled={enabled}, api_key={'SET' if api_key else 'NOT SET'}, region={region}, account={account}")
-    
-    return enabled and bool(api_key and region and account)
-
-
-def detect_log_destination(crash_info: Dict[str, Any]) -> str:
-    """
-    Detect whether logs should be retrieved from CloudWatch or Coralogix.
-    Returns 'coralogix', 'cloudwatch', or 'none'.
-    """
-    # If Coralogix is enabled and configured, prefer it
-    if is_coralogix_enabled():
-        print("🎯 Coralogix integration is enabled and configured")
-        return 'coralogix'
-    
-    # Fall back to CloudWatch detection logic
-    from ecs_utils import get_log_configuration_from_task_def
-    log_config = get_log_configuration_from_task_def(crash_info)
-    
-    if log_config and log_config.get('awslogs-group'):
-        print("🎯 CloudWatch logs detected in task definition")
-        return 'cloudwatch'
-    
-    print("🎯 No log destination detected")
-    return 'none'
\ No newline at end of file
+    return _CORALOGIX_ENABLED
\ No newline at end of file
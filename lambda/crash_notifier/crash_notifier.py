@@ -7,6 +7,7 @@ This module orchestrates the workflow using specialized utility modules.
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 from slack_notifier import SlackNotifier
@@ -51,8 +52,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         crash_info = extract_crash_info(detail)
         enriched = enrich_crash_data(crash_info)
 
-        cluster_arn = enriched.get("cluster_arn", "") or ""
-        region = cluster_arn.split(":")[3] if cluster_arn.count(":") >= 3 else os.environ.get("AWS_REGION", "us-east-1")
+        region = enriched.get("aws_region") or os.environ.get("AWS_REGION", "us-east-1")
         key = service_key(enriched["cluster_name"], enriched["service_name"], region)
 
         state = get_or_create_alert_state(key, enriched, _window_seconds())
@@ -86,14 +86,23 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         mode = _alert_mode()
         did_anything = False
 
-        if mode in ("edit", "edit_and_thread"):
+        if mode == "edit_and_thread":
+            # The edit and the thread reply are independent Slack calls, so
+            # overlap them instead of paying two round-trips back to back.
             blocks = notifier._create_crash_blocks(enriched, aggregation=item)
             text = f"🚨 ECS Crash Loop: {enriched['service_name']} (x{crash_count})"
-            did_anything = notifier.update_alert(channel, ts, blocks, text) or did_anything
-
-        if mode in ("thread", "edit_and_thread"):
             reply_text = _build_thread_reply_text(enriched, crash_count)
-            did_anything = notifier.reply_in_thread(channel, ts, reply_text) or did_anything
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                edit_future = executor.submit(notifier.update_alert, channel, ts, blocks, text)
+                reply_future = executor.submit(notifier.reply_in_thread, channel, ts, reply_text)
+                did_anything = edit_future.result() or reply_future.result()
+        elif mode == "edit":
+            blocks = notifier._create_crash_blocks(enriched, aggregation=item)
+            text = f"🚨 ECS Crash Loop: {enriched['service_name']} (x{crash_count})"
+            did_anything = notifier.update_alert(channel, ts, blocks, text)
+        elif mode == "thread":
+            reply_text = _build_thread_reply_text(enriched, crash_count)
+            did_anything = notifier.reply_in_thread(channel, ts, reply_text)
 
         return _response(200, enriched, slack_ok=did_anything, action=f"aggregated_{mode}")
 
@@ -3,52 +3,84 @@ ECS utilities module for extracting and enriching crash information.
 Handles all ECS-related API calls and data processing.
 """
 
+import os
+
 import boto3
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
-# Initialize ECS client
-ecs_client = boto3.client('ecs')
+# Initialize ECS client. Tight timeouts and standard-mode retries keep a
+# throttled or slow ECS endpoint from stalling the whole notification; the
+# defaults (60 s connect, legacy retries) can burn most of the Lambda timeout.
+_ecs_config = Config(
+    region_name=os.environ.get('AWS_REGION'),
+    retries={'max_attempts': 2, 'mode': 'standard'},
+    connect_timeout=2,
+    read_timeout=5,
+    max_pool_connections=4,
+)
+ecs_client = boto3.client('ecs', config=_ecs_config)
+
+
+@lru_cache(maxsize=128)
+def _describe_td(task_def_arn: str) -> Dict[str, Any]:
+    """
+    Describe a task definition, memoized on the ARN.
+
+    Task definition revisions are immutable, so the cache is safe across warm
+    Lambda invocations and saves the second describe call per crash (both the
+    details enrichment and the log-config lookup need the same revision).
+    """
+    response = ecs_client.describe_task_definition(taskDefinition=task_def_arn)
+    return response.get('taskDefinition', {})
 
 
 def extract_crash_info(detail: Dict[str, Any]) -> Dict[str, Any]:
     """Extract basic crash information from EventBridge event"""
     
-    # Parse cluster ARN to get cluster name
+    # Parse cluster ARN to get cluster name and region. The region is parsed
+    # once here and carried on crash_info so downstream consumers (Slack
+    # blocks, console links) don't re-split the ARN.
     cluster_arn = detail.get('clusterArn', '')
     cluster_name = cluster_arn.split('/')[-1] if cluster_arn else 'unknown'
+    if cluster_arn.count(':') >= 3:
+        # arn:aws:ecs:region:... — stop splitting after the region segment
+        aws_region = cluster_arn.split(':', 4)[3]
+    else:
+        aws_region = os.environ.get('AWS_REGION', 'us-east-1')
     
-    # Extract service name from group
+    # Extract service name from group (slice off the 'service:' prefix)
     group = detail.get('group', '')
-    service_name = group.replace('service:', '') if group.startswith('service:') else group
+    service_name = group[8:] if group.startswith('service:') else group
     
-    # Get container exit codes and reasons
+    # Get container exit codes and reasons — single pass over the list
     containers = detail.get('containers', [])
-    failed_container = None
-    exit_code = None
-    container_reason = None
-    
-    for container in containers:
-        if container.get('exitCode', 0) != 0:
-            failed_container = container
-            exit_code = container.get('exitCode')
-            container_reason = container.get('reason', '')
-            break
-    
-    # For launch failures, there might not be any containers with exit codes
-    # In this case, the task-level stoppedReason will contain the error
-    if not failed_container and containers:
-        # Take the first container for context, even if it didn't fail
+    failed_container = next((c for c in containers if c.get('exitCode', 0) != 0), None)
+
+    if failed_container is not None:
+        exit_code = failed_container.get('exitCode')
+        container_reason = failed_container.get('reason', '')
+    elif containers:
+        # For launch failures, there might not be any containers with exit
+        # codes; the task-level stoppedReason will contain the error. Take
+        # the first container for context, even if it didn't fail.
         failed_container = containers[0]
+        exit_code = None
         # Look for container-level reason even without exit code
         container_reason = failed_container.get('reason', '')
+    else:
+        exit_code = None
+        container_reason = None
     
     # Extract task definition version from ARN
     task_definition_arn = detail.get('taskDefinitionArn', '')
     task_def_version = 'N/A'
     if task_definition_arn:
         # Extract version from ARN like: arn:aws:ecs:region:account:task-definition/family:revision
-        task_def_version = task_definition_arn.split(':')[-1]
+        task_def_version = task_definition_arn[task_definition_arn.rfind(':') + 1:]
 
     
     return {
@@ -56,6 +88,7 @@ def extract_crash_info(detail: Dict[str, Any]) -> Dict[str, Any]:
         'started_at': detail.get('startedAt', ''),
         'cluster_name': cluster_name,
         'cluster_arn': cluster_arn,
+        'aws_region': aws_region,
         'service_name': service_name,
         'task_arn': detail.get('taskArn', ''),
         'task_definition_arn': task_definition_arn,
@@ -71,51 +104,58 @@ def extract_crash_info(detail: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def enrich_crash_data(crash_info: Dict[str, Any]) -> Dict[str, Any]:
-    """Enrich crash data with additional AWS API calls"""
-    
-    enriched = crash_info.copy()
-    
+    """Enrich crash data in place with additional AWS API calls.
+
+    Nothing downstream needs the un-enriched dict, so we mutate and return
+    crash_info directly rather than paying for a shallow copy per event.
+    """
     try:
         print(f"Enriching crash data for task: {crash_info.get('task_arn', 'unknown')}")
-        
+
         # Skip service details collection - not needed for notifications
-        
-        # Get recent logs from the failed container (if available)
-        if crash_info['failed_container']:
-            print(f"Getting logs for container: {crash_info['failed_container'].get('name', 'unknown')}")
-            # Import here to avoid circular imports
-            from logs_utils import get_recent_logs
-            log_entries = get_recent_logs(crash_info)
-            enriched['recent_logs'] = log_entries
-            # Preserve the log_source that was set during log retrieval
-            if 'log_source' in crash_info:
-                enriched['log_source'] = crash_info['log_source']
-                print(f"🐛 DEBUG: Preserved log_source in enriched data: {enriched['log_source']}")
-            print(f"Enriched data now has {len(log_entries)} log entries")
-        else:
-            print("No container found for log retrieval")
-            
-        # Get task definition details
-        if crash_info['task_definition_arn']:
-            print(f"Getting task definition details")
-            task_def_details = get_task_definition_details(crash_info['task_definition_arn'])
-            enriched.update(task_def_details)
-            
+
+        # Import here to avoid circular imports
+        from logs_utils import get_recent_logs
+
+        # Log retrieval (an HTTP call to Coralogix/Elasticsearch/CloudWatch)
+        # and the task-definition describe are independent I/O — run both
+        # concurrently so the critical path is the slower of the two instead
+        # of their sum.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            logs_future = None
+            task_def_future = None
+
+            if crash_info['failed_container']:
+                print(f"Getting logs for container: {crash_info['failed_container'].get('name', 'unknown')}")
+                logs_future = executor.submit(get_recent_logs, crash_info)
+            else:
+                print("No container found for log retrieval")
+
+            if crash_info['task_definition_arn']:
+                print(f"Getting task definition details")
+                task_def_future = executor.submit(
+                    get_task_definition_details, crash_info['task_definition_arn']
+                )
+
+            if logs_future is not None:
+                log_entries = logs_future.result()
+                crash_info['recent_logs'] = log_entries
+                print(f"Enriched data now has {len(log_entries)} log entries")
+
+            if task_def_future is not None:
+                crash_info.update(task_def_future.result())
+
     except Exception as e:
         print(f"Error enriching crash data: {str(e)}")
-        enriched['enrichment_error'] = str(e)
-    
-    return enriched
+        crash_info['enrichment_error'] = str(e)
+
+    return crash_info
 
 
 def get_task_definition_details(task_def_arn: str) -> Dict[str, Any]:
     """Get task definition details"""
     try:
-        response = ecs_client.describe_task_definition(
-            taskDefinition=task_def_arn
-        )
-        
-        task_def = response.get('taskDefinition', {})
+        task_def = _describe_td(task_def_arn)
         return {
             'cpu': task_def.get('cpu'),
             'memory': task_def.get('memory'),
@@ -138,11 +178,7 @@ def get_log_configuration_from_task_def(crash_info: Dict[str, Any]) -> Optional[
             return None
             
         print(f"Describing task definition: {task_def_arn}")
-        response = ecs_client.describe_task_definition(
-            taskDefinition=task_def_arn
-        )
-        
-        task_def = response.get('taskDefinition', {})
+        task_def = _describe_td(task_def_arn)
         failed_container = crash_info.get('failed_container', {})
         container_name = failed_container.get('name', '') if failed_container else ''
         
@@ -150,11 +186,17 @@ def get_log_configuration_from_task_def(crash_info: Dict[str, Any]) -> Optional[
             print("No container name found for log configuration lookup")
             return None
         
+        container_defs = task_def.get('containerDefinitions', [])
         print(f"Looking for container '{container_name}' in task definition")
-        print(f"Available containers: {[c.get('name') for c in task_def.get('containerDefinitions', [])]}")
-        
+        print(f"Available containers: {[c.get('name') for c in container_defs]}")
+
+        # Record the container count while the task definition is in hand —
+        # log retrieval uses it to pick between per-stream and Insights paths
+        # (enrichment fills it too, but that runs concurrently with logs).
+        crash_info.setdefault('container_count', len(container_defs))
+
         # Find the specific container definition
-        for container_def in task_def.get('containerDefinitions', []):
+        for container_def in container_defs:
             if container_def.get('name') == container_name:
                 log_config = container_def.get('logConfiguration', {})
                 print(f"Found log configuration for {container_name}: {log_config}")
@@ -9,6 +9,18 @@ import requests
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
+# Prefer orjson for response parsing (~5x faster than stdlib json on large
+# search responses); fall back to stdlib if the layer lacks it.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Module-scope session so warm Lambda invocations reuse the TLS connection
+# to the Elasticsearch endpoint instead of re-handshaking on every crash event.
+_session = requests.Session()
+
 
 def get_elasticsearch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -39,6 +51,14 @@ def get_elasticsearch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         search_body = {
             "size": 50,  # Limit to 50 most recent logs
             "sort": [{"@timestamp": {"order": "desc"}}],
+            # Only fetch the fields we actually read below — without this,
+            # Elasticsearch returns full documents and doubles the bytes on
+            # the wire plus the client-side parse cost.
+            "_source": [
+                "@timestamp", "message", "level", "container_name", "source",
+                "ecs_cluster", "ecs_task_arn", "ecs_task_definition",
+                "appName", "environment", "version", "categoryName", "code",
+            ],
             "query": {
                 "term": {
                     "ecs_task_arn": {
@@ -57,7 +77,7 @@ def get_elasticsearch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         
         print(f"📡 Making Elasticsearch API request to: {url}")
         
-        response = requests.post(
+        response = _session.post(
             url,
             auth=auth,
             headers=headers,
@@ -66,7 +86,7 @@ def get_elasticsearch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         )
         
         response.raise_for_status()
-        result = response.json()
+        result = _loads(response.content)
         
         # Extract log entries from the response
         log_entries = []
@@ -90,8 +110,6 @@ def get_elasticsearch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
                 'version': source.get('version', ''),
                 'category_name': source.get('categoryName', ''),
                 'code': source.get('code', ''),
-                # Include any other fields that might be useful
-                'raw_log': source
             }
             
             log_entries.append(log_entry)
@@ -156,33 +174,4 @@ def generate_elasticsearch_ui_link(crash_info: Dict[str, Any], logs_limit: int =
         
     except Exception as e:
         print(f"❌ Error generating Kibana UI link: {e}")
-        return None
-
-
-def detect_log_destination(crash_info: Dict[str, Any]) -> str:
-    """
-    Detect whether to use Elasticsearch, Coralogix, or CloudWatch for log retrieval.
-    Enhanced version that includes Elasticsearch detection.
-    """
-    # Check if Elasticsearch integration is enabled and configured
-    elasticsearch_enabled = os.environ.get('ENABLE_ELASTICSEARCH_INTEGRATION', 'false').lower() == 'true'
-    elasticsearch_endpoint = os.environ.get('ELASTICSEARCH_ENDPOINT')
-    elasticsearch_username = os.environ.get('ELASTICSEARCH_USERNAME')
-    elasticsearch_password = os.environ.get('ELASTICSEARCH_PASSWORD')
-    
-    if elasticsearch_enabled and elasticsearch_endpoint and elasticsearch_username and elasticsearch_password:
-        print("🔍 Elasticsearch integration is enabled and configured")
-        return 'elasticsearch'
-    
-    # Check if Coralogix integration is enabled and configured
-    coralogix_enabled = os.environ.get('ENABLE_CORALOGIX_INTEGRATION', 'false').lower() == 'true'
-    coralogix_api_key = os.environ.get('CORALOGIX_API_KEY')
-    coralogix_region = os.environ.get('CORALOGIX_REGION')
-    
-    if coralogix_enabled and coralogix_api_key and coralogix_region:
-        print("🔍 Coralogix integration is enabled and configured")
-        return 'coralogix'
-    
-    # Default to CloudWatch
-    print("🔍 Using CloudWatch for log retrieval")
-    return 'cloudwatch'
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Single source of truth for picking the log backend for a crash.
+
+coralogix_utils and elasticsearch_utils used to each define their own
+detect_log_destination with different precedence, so which one ran depended
+on import order. The backend table below is walked once at import time
+(Lambda env config is fixed for the container lifetime) and the CloudWatch
+fallback is only evaluated per crash when no backend is enabled.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+# Backends in precedence order: (name, enable flag, required env vars)
+_BACKENDS = (
+    ('elasticsearch', 'ENABLE_ELASTICSEARCH_INTEGRATION',
+     ('ELASTICSEARCH_ENDPOINT', 'ELASTICSEARCH_USERNAME', 'ELASTICSEARCH_PASSWORD')),
+    ('coralogix', 'ENABLE_CORALOGIX_INTEGRATION',
+     ('CORALOGIX_API_KEY', 'CORALOGIX_REGION')),
+)
+
+
+def _resolve_active_backend() -> Optional[str]:
+    for name, enable_flag, required_vars in _BACKENDS:
+        enabled = os.environ.get(enable_flag, 'false').lower() == 'true'
+        if enabled and all(os.environ.get(var) for var in required_vars):
+            return name
+    return None
+
+
+_ACTIVE = _resolve_active_backend()
+
+
+def _has_awslogs(crash_info: Dict[str, Any]) -> bool:
+    """Check whether the task definition routes the failed container to awslogs."""
+    # Import here to avoid circular imports
+    from ecs_utils import get_log_configuration_from_task_def
+    log_config = get_log_configuration_from_task_def(crash_info)
+    return bool(log_config and log_config.get('awslogs-group'))
+
+
+def detect_log_destination(crash_info: Dict[str, Any]) -> str:
+    """
+    Detect where to retrieve logs from for this crash.
+    Returns 'elasticsearch', 'coralogix', 'cloudwatch', or 'none'.
+    """
+    if _ACTIVE:
+        print(f"🔍 {_ACTIVE} integration is enabled and configured")
+        return _ACTIVE
+
+    if _has_awslogs(crash_info):
+        print("🔍 Using CloudWatch for log retrieval")
+        return 'cloudwatch'
+
+    print("🔍 No log destination detected")
+    return 'none'
@@ -3,125 +3,146 @@ CloudWatch Logs utilities module for retrieving container logs.
 Handles all CloudWatch Logs API calls and log processing.
 """
 
+import os
+import time
+import logging
 import boto3
-from typing import Dict, Any, List
+from botocore.config import Config
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Union
 
-# Initialize CloudWatch Logs client
-logs_client = boto3.client('logs')
+# CloudWatch returns bare message strings; the remote backends return
+# {'timestamp', 'message'} dicts. The Slack file writer accepts both.
+LogEntry = Union[str, Dict[str, Any]]
 
+from coralogix_utils import get_coralogix_logs
+from elasticsearch_utils import get_elasticsearch_logs
+from log_destination import detect_log_destination
 
-def get_recent_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Get recent logs for the specific failed task from Coralogix or CloudWatch"""
+# Lazy, level-gated logging: logger.debug() is a no-op at the default
+# WARNING level (no string formatting, no CloudWatch ingestion bytes), and
+# logger.exception() only walks/format the traceback when it actually emits.
+# Unrecognized LOG_LEVEL values fall back to WARNING — a config typo must
+# not fail Lambda init and take crash notifications down with it.
+logger = logging.getLogger(__name__)
+_level = getattr(logging, os.environ.get('LOG_LEVEL', '').strip().upper(), logging.WARNING)
+logger.setLevel(_level if isinstance(_level, int) else logging.WARNING)
+
+# Initialize CloudWatch Logs client. TCP keep-alive plus a larger pool lets
+# warm invocations reuse TLS connections across the describe/filter call
+# pairs, and adaptive retries throttle client-side instead of slamming the
+# DescribeLogStreams quota.
+logs_client = boto3.client('logs', config=Config(
+    tcp_keepalive=True,
+    max_pool_connections=25,
+    connect_timeout=3,
+    read_timeout=10,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+))
+
+
+def get_recent_logs(crash_info: Dict[str, Any]) -> List[LogEntry]:
+    """Get recent logs for the specific failed task from the detected backend"""
     try:
-        print(f"🐛 DEBUG: Starting get_recent_logs, initial log_source: {crash_info.get('log_source', 'NOT SET')}")
-        
+        # Guard on the inputs every backend needs before paying for
+        # destination detection (which can call DescribeTaskDefinition).
         failed_container = crash_info.get('failed_container')
         if not failed_container:
-            print("No failed container found in crash info")
+            logger.warning("No failed container found in crash info")
             return []
-        
-        # Import here to avoid circular imports
-        from coralogix_utils import get_coralogix_logs
-        from elasticsearch_utils import detect_log_destination, get_elasticsearch_logs
-        
-        # Detect whether to use Elasticsearch, Coralogix, or CloudWatch
-        log_destination = detect_log_destination(crash_info)
-        print(f"🐛 DEBUG: Detected log destination: {log_destination}")
-        print(f"🐛 DEBUG: log_source before log retrieval attempt: {crash_info.get('log_source', 'NOT SET')}")
-        
-        if log_destination == 'elasticsearch':
-            print("🔄 Using Elasticsearch for log retrieval")
-            logs = get_elasticsearch_logs(crash_info)
-            print(f"🐛 DEBUG: After Elasticsearch call, log_source: {crash_info.get('log_source', 'NOT SET')}")
-            if logs:
-                print(f"✅ Retrieved {len(logs)} log entries from Elasticsearch")
-                crash_info['log_source'] = 'elasticsearch'  # Force set it again
-                print(f"🐛 DEBUG: FORCED log_source to: {crash_info.get('log_source')}")
-                return logs
-            else:
-                print("⚠️ No logs found in Elasticsearch, falling back to CloudWatch")
-                # Fall through to CloudWatch
-        
-        if log_destination == 'coralogix':
-            print("🔄 Using Coralogix for log retrieval")
-            logs = get_coralogix_logs(crash_info)
-            print(f"🐛 DEBUG: After Coralogix call, log_source: {crash_info.get('log_source', 'NOT SET')}")
-            if logs:
-                print(f"✅ Retrieved {len(logs)} log entries from Coralogix")
-                crash_info['log_source'] = 'coralogix'  # Force set it again
-                print(f"🐛 DEBUG: FORCED log_source to: {crash_info.get('log_source')}")
-                return logs
-            else:
-                print("⚠️ No logs found in Coralogix, falling back to CloudWatch")
-                # Fall through to CloudWatch
-        
-        if log_destination == 'cloudwatch' or log_destination in ['coralogix', 'elasticsearch']:
-            print("🔄 Using CloudWatch for log retrieval")
+
+        if not crash_info.get('task_arn'):
+            logger.warning("No task ARN found in crash info")
+            return []
+
+        # Detect once per crash_info and memoize so repeat lookups are free
+        log_destination = crash_info.setdefault(
+            '_log_destination', detect_log_destination(crash_info)
+        )
+
+        fetcher = _LOG_FETCHERS.get(log_destination)
+        if fetcher is None:
+            logger.warning("No log destination available")
+            return []
+
+        logger.debug("Using %s for log retrieval", log_destination)
+        logs = fetcher(crash_info)
+        if logs:
+            logger.debug("Retrieved %d log entries from %s", len(logs), log_destination)
+            crash_info['log_source'] = log_destination
+            return logs
+
+        # Remote backends fall back to CloudWatch when they return nothing
+        if log_destination != 'cloudwatch':
+            logger.debug("No logs found in %s, falling back to CloudWatch", log_destination)
             logs = get_cloudwatch_logs(crash_info)
-            if logs and crash_info.get('log_source') not in ['coralogix', 'elasticsearch']:
+            if logs:
                 crash_info['log_source'] = 'cloudwatch'
-                print(f"🐛 DEBUG: Set log_source to cloudwatch")
-            print(f"🐛 DEBUG: Final log_source before return: {crash_info.get('log_source', 'NOT SET')}")
             return logs
-        
-        print("❌ No log destination available")
+
         return []
-        
-    except Exception as e:
-        print(f"Error getting recent logs for task: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+
+    except Exception:
+        logger.exception("Error getting recent logs for task")
         return []
 
 
-def get_cloudwatch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Get recent CloudWatch logs for the specific failed task using ONLY task definition"""
-def get_cloudwatch_logs(crash_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+def get_cloudwatch_logs(crash_info: Dict[str, Any]) -> List[str]:
     """Get recent CloudWatch logs for the specific failed task using ONLY task definition"""
     try:
         failed_container = crash_info.get('failed_container')
         if not failed_container:
-            print("No failed container found in crash info")
+            logger.warning("No failed container found in crash info")
             return []
             
         container_name = failed_container.get('name', '')
         task_arn = crash_info.get('task_arn', '')
         
         if not container_name or not task_arn:
-            print(f"Missing container name ({container_name}) or task ARN ({task_arn})")
+            logger.warning("Missing container name (%s) or task ARN (%s)", container_name, task_arn)
             return []
         
         # Extract task ID from task ARN
         task_id = task_arn.split('/')[-1] if task_arn else ''
-        print(f"Looking for logs for task {task_id}, container {container_name}")
+        logger.debug("Looking for logs for task %s, container %s", task_id, container_name)
         
         # Get log configuration from task definition - ONLY authoritative source
         from ecs_utils import get_log_configuration_from_task_def
         log_config = get_log_configuration_from_task_def(crash_info)
         
         if log_config:
-            print(f"SUCCESS: Found log config from task definition: {log_config}")
+            logger.debug("Found log config from task definition: %s", log_config)
+
+            # Multi-container tasks may log to several streams in the group;
+            # a single Insights query covers them all instead of one
+            # per-stream call each. Single-container stays on the cheaper
+            # direct GetLogEvents path.
+            if crash_info.get('container_count', 1) > 1:
+                logs = get_logs_via_insights(crash_info, log_config.get('awslogs-group', ''), task_id)
+                if logs:
+                    crash_info['log_source'] = 'cloudwatch'
+                    return logs
+                logger.debug("Insights query returned nothing, falling back to per-stream retrieval")
+
             logs = get_logs_with_config(crash_info, log_config, task_id)
             if logs:
-                print(f"SUCCESS: Retrieved {len(logs)} log entries using task definition config")
+                logger.debug("Retrieved %d log entries using task definition config", len(logs))
                 # Add metadata to indicate source
                 crash_info['log_source'] = 'cloudwatch'
                 return logs
             else:
-                print("INFO: Task definition config is correct, but no logs found in time window (container may not have logged anything)")
+                logger.debug("Task definition config is correct, but no logs found in time window (container may not have logged anything)")
                 return []
         else:
-            print("ERROR: No log config found in task definition - container not configured for CloudWatch logging")
+            logger.warning("No log config found in task definition - container not configured for CloudWatch logging")
             return []
         
-    except Exception as e:
-        print(f"Error getting CloudWatch logs for task: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+    except Exception:
+        logger.exception("Error getting CloudWatch logs for task")
         return []
 
 
-def get_logs_with_config(crash_info: Dict[str, Any], log_config: Dict[str, Any], task_id: str) -> List[Dict[str, Any]]:
+def get_logs_with_config(crash_info: Dict[str, Any], log_config: Dict[str, Any], task_id: str) -> List[str]:
     """Get logs using the actual log configuration from task definition"""
     try:
         # Extract log group and stream prefix from actual config
@@ -129,13 +150,10 @@ def get_logs_with_config(crash_info: Dict[str, Any], log_config: Dict[str, Any],
         stream_prefix = log_config.get('awslogs-stream-prefix', '')
         region = log_config.get('awslogs-region', '')
         
-        print(f"Using EXACT log config from task definition:")
-        print(f"  Log group: {log_group}")
-        print(f"  Stream prefix: {stream_prefix}")
-        print(f"  Region: {region}")
+        logger.debug("Using log config from task definition: group=%s prefix=%s region=%s", log_group, stream_prefix, region)
         
         if not log_group:
-            print("ERROR: No log group specified in task definition!")
+            logger.warning("No log group specified in task definition")
             return []
         
         # Build the actual log stream name according to ECS documentation
@@ -143,7 +161,7 @@ def get_logs_with_config(crash_info: Dict[str, Any], log_config: Dict[str, Any],
         container_name = failed_container.get('name', '') if failed_container else ''
         
         if not container_name:
-            print("ERROR: No container name available for log stream construction")
+            logger.warning("No container name available for log stream construction")
             return []
         
         # ECS log stream naming: [prefix/]container-name/task-id
@@ -152,88 +170,166 @@ def get_logs_with_config(crash_info: Dict[str, Any], log_config: Dict[str, Any],
         else:
             log_stream = f"{container_name}/{task_id}"
         
-        print(f"Constructed log stream name: {log_stream}")
-        
-        # Verify the log stream exists before trying to get logs
-        try:
-            print(f"Verifying log stream exists in {log_group}...")
-            response = logs_client.describe_log_streams(
-                logGroupName=log_group,
-                logStreamNamePrefix=log_stream,
-                limit=1
-            )
-            
-            if not response.get('logStreams'):
-                print(f"ERROR: Log stream {log_stream} not found in {log_group}")
-                # Try to find what streams DO exist for this task
-                print(f"Searching for any streams containing task ID {task_id}...")
+        logger.debug("Constructed log stream name: %s", log_stream)
+
+        # The stream name is deterministic (prefix/container/task-id per the
+        # ECS docs), so query it directly instead of paying a
+        # DescribeLogStreams verification round-trip on every crash — that
+        # extra call is the classic throttling trigger on busy log groups.
+        logs = get_logs_from_stream(crash_info, log_group, log_stream)
+        if logs:
+            crash_info['_resolved_log_stream'] = log_stream
+            return logs
+
+        # The constructed name is the full `prefix/container/task-id`, so a
+        # prefix describe can only ever match the stream just queried —
+        # re-fetching it would be a guaranteed-empty duplicate call. The
+        # describe is purely diagnostic: it distinguishes "stream exists but
+        # is empty" from "container never logged" in the log output.
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
                 response = logs_client.describe_log_streams(
                     logGroupName=log_group,
-                    orderBy='LastEventTime',
-                    descending=True,
-                    limit=50
+                    logStreamNamePrefix=log_stream,
+                    limit=1
                 )
-                
-                matching_streams = [s['logStreamName'] for s in response.get('logStreams', []) if task_id in s['logStreamName']]
-                if matching_streams:
-                    print(f"Found alternative streams with task ID: {matching_streams}")
-                    # Use the first matching stream
-                    log_stream = matching_streams[0]
-                    print(f"Using stream: {log_stream}")
+                if response.get('logStreams'):
+                    logger.debug("Stream %s exists but is empty in the time window", log_stream)
                 else:
-                    print(f"No streams found containing task ID {task_id} in log group {log_group}")
-                    return []
-            else:
-                actual_stream = response['logStreams'][0]['logStreamName']
-                print(f"Confirmed log stream exists: {actual_stream}")
-                log_stream = actual_stream
-        
-        except Exception as verify_error:
-            print(f"Error verifying log stream: {str(verify_error)}")
+                    logger.debug("No stream named %s in %s (container never logged)", log_stream, log_group)
+            except Exception:
+                logger.exception("Error describing log stream %s", log_stream)
+        return []
+
+    except Exception:
+        logger.exception("Error getting logs with config")
+        return []
+
+
+def get_logs_via_insights(crash_info: Dict[str, Any], log_group: str, task_id: str) -> List[Dict[str, Any]]:
+    """
+    Query all of a task's streams in one shot with CloudWatch Logs Insights.
+
+    Multi-container tasks write one stream per container; a single
+    StartQuery/GetQueryResults pair replaces one GetLogEvents call per
+    container by filtering on the task ID in the stream name.
+    """
+    try:
+        if not log_group:
             return []
-        
-        return get_logs_from_stream(crash_info, log_group, log_stream)
-        
-    except Exception as e:
-        print(f"Error getting logs with config: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+
+        end_time = int(time.time())
+        start_time = end_time - 3600
+        started_at = crash_info.get('started_at', '')
+        if started_at:
+            try:
+                started = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
+                start_time = int(started.timestamp()) - 300
+            except ValueError:
+                pass
+
+        logger.debug("Starting Insights query for task %s in %s", task_id, log_group)
+        start = logs_client.start_query(
+            logGroupName=log_group,
+            startTime=start_time,
+            endTime=end_time,
+            queryString=(
+                "fields @timestamp, @message "
+                f"| filter @logStream like /{task_id}/ "
+                "| sort @timestamp desc | limit 200"
+            ),
+        )
+        query_id = start['queryId']
+
+        # Poll with a short exponential backoff, bounded so a slow query
+        # can't eat the Lambda timeout.
+        deadline = time.time() + 10
+        delay = 0.2
+        while True:
+            result = logs_client.get_query_results(queryId=query_id)
+            status = result.get('status')
+            if status not in ('Scheduled', 'Running'):
+                break
+            if time.time() >= deadline:
+                logger.warning("Insights query %s still %s at deadline, abandoning", query_id, status)
+                return []
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        if status != 'Complete':
+            logger.warning("Insights query %s finished with status %s", query_id, status)
+            return []
+
+        now_ms = int(time.time() * 1000)
+        log_entries = []
+        for row in result.get('results', []):
+            fields = {f['field']: f['value'] for f in row}
+            timestamp_ms = now_ms
+            ts = fields.get('@timestamp', '')
+            if ts:
+                try:
+                    # Insights returns '2026-04-23 10:00:00.000' in UTC
+                    dt = datetime.strptime(ts, '%Y-%m-%d %H:%M:%S.%f').replace(tzinfo=timezone.utc)
+                    timestamp_ms = int(dt.timestamp() * 1000)
+                except ValueError:
+                    pass
+            log_entries.append({'timestamp': timestamp_ms, 'message': fields.get('@message', '')})
+
+        logger.debug("Insights query returned %d log entries", len(log_entries))
+        return log_entries
+
+    except Exception:
+        logger.exception("Error querying logs via Insights")
         return []
 
 
-def get_logs_from_stream(crash_info: Dict[str, Any], log_group: str, log_stream: str) -> List[Dict[str, Any]]:
-    """Get ALL logs from a specific log group and stream - no time filtering"""
+def get_logs_from_stream(crash_info: Dict[str, Any], log_group: str, log_stream: str) -> List[str]:
+    """Get the most recent log messages from a specific log group and stream.
+
+    Returns bare message strings — the only consumer is the Slack log file,
+    which never reads the timestamps, so wrapping every event in a dict was
+    pure allocation overhead.
+    """
     try:
-        print(f"Getting ALL logs from {log_group}/{log_stream}")
-        
-        # Just get ALL logs from this stream - no time filtering!
-        response = logs_client.filter_log_events(
+        logger.debug("Getting recent logs from %s/%s", log_group, log_stream)
+
+        # For a single known stream, GetLogEvents with startFromHead=False is
+        # the cheap way to get the tail of the log in one call — unlike the
+        # previous filter_log_events(limit=100), which scanned forward and
+        # silently truncated at the first page.
+        response = logs_client.get_log_events(
             logGroupName=log_group,
-            logStreamNames=[log_stream],
-            limit=100  # Get up to 100 log events
+            logStreamName=log_stream,
+            limit=200,
+            startFromHead=False
         )
-        
+
         events = response.get('events', [])
-        print(f"Found {len(events)} total log events in stream")
-        
+        logger.debug("Found %d log events in stream", len(events))
+
         if not events:
-            print("No log events found in this stream")
+            logger.debug("No log events found in this stream")
             return []
-        
-        # Just return all the logs, sorted by timestamp
-        log_entries = [
-            {
-                'timestamp': event['timestamp'],
-                'message': event['message'].strip()
-            }
-            for event in events
-        ]
-        
-        print(f"Returning {len(log_entries)} log entries (all logs from stream)")
+
+        # Return the tail of the log, oldest first (GetLogEvents already
+        # returns events in timestamp order)
+        log_entries = [event['message'] for event in events]
+
+        logger.debug("Returning %d log entries (tail of stream)", len(log_entries))
         return log_entries
-        
-    except Exception as e:
-        print(f"Error getting logs from stream {log_stream}: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
-        return []
\ No newline at end of file
+
+    except logs_client.exceptions.ResourceNotFoundException:
+        # Routine on the direct path: the constructed stream doesn't exist
+        # because the container never logged anything. Not an error.
+        logger.debug("Stream %s does not exist in %s", log_stream, log_group)
+        return []
+    except Exception:
+        logger.exception("Error getting logs from stream %s", log_stream)
+        return []
+
+# Backend dispatch for get_recent_logs, keyed by detected log destination
+_LOG_FETCHERS = {
+    'elasticsearch': get_elasticsearch_logs,
+    'coralogix': get_coralogix_logs,
+    'cloudwatch': get_cloudwatch_logs,
+}
@@ -3,11 +3,70 @@ Slack notification module for ECS crash events.
 Handles all Slack-related functionality including message formatting and file uploads.
 """
 
+import io
+import json
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 
+# Prefer orjson for payload serialization (~4x faster than stdlib json on the
+# nested blocks lists); fall back to stdlib if the layer lacks it.
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+# Module-scope session so warm Lambda invocations reuse the TLS connection to
+# slack.com across the 3-call upload flow and subsequent notifications,
+# with bounded retries on transient Slack/API errors. The upload flow talks
+# to two hosts (slack.com for the API calls, files.slack.com for the file
+# body), so pool_connections must stay >= 2 to keep both cached. POST must
+# be opted into allowed_methods (urllib3 excludes it by default) or the
+# status_forcelist never fires — every Slack call here is a POST.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({'POST'}),
+    ),
+))
+
+
+def _prewarm_slack_connection() -> None:
+    """
+    Open the TLS connection to slack.com during Lambda init (init CPU is
+    free and unthrottled) so the first crash notification skips the
+    handshake. Opt-in via SLACK_PREWARM_CONNECTION; failures are ignored.
+    """
+    token = os.environ.get('SLACK_BOT_TOKEN')
+    if not token:
+        return
+    try:
+        _SESSION.post(
+            "https://slack.com/api/auth.test",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=3,
+        )
+    except requests.RequestException:
+        pass
+
+
+if os.environ.get('SLACK_PREWARM_CONNECTION', '').lower() == 'true':
+    _prewarm_slack_connection()
+
 
 class SlackNotifier:
     """Handles Slack notifications for ECS crash events using Bot API."""
@@ -36,10 +95,12 @@ class SlackNotifier:
         payload["channel"] = self.channel
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
+            response = _SESSION.post(url, headers=headers, data=_dumps(payload), timeout=30)
+            if not response.ok:
+                print(f"❌ Slack HTTP {response.status_code} for {message_type}")
+                return False, None
+
+            result = _loads(response.content)
             if result.get("ok"):
                 ts = result.get("ts")
                 print(f"✅ {message_type} Slack message sent successfully!")
@@ -57,6 +118,19 @@ class SlackNotifier:
         ok, _channel, _ts = self.post_new_alert(crash_info)
         return ok
 
+    def send_crash_notifications_batch(self, crash_infos: list) -> list:
+        """
+        Send several crash notifications concurrently.
+
+        Each notification is dominated by Slack round-trip latency, so a batch
+        of K crashes completes in ~1x latency instead of Kx. Returns the list
+        of per-crash success flags in input order.
+        """
+        if not crash_infos:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(crash_infos))) as executor:
+            return list(executor.map(self.send_crash_notification, crash_infos))
+
     def post_new_alert(
         self,
         crash_info: Dict[str, Any],
@@ -117,9 +191,11 @@ class SlackNotifier:
             "Content-Type": "application/json",
         }
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            result = response.json()
+            response = _SESSION.post(url, headers=headers, data=_dumps(payload), timeout=30)
+            if not response.ok:
+                print(f"❌ Slack HTTP {response.status_code} for {message_type}")
+                return False
+            result = _loads(response.content)
             if result.get("ok"):
                 print(f"✅ {message_type} succeeded")
                 return True
@@ -146,7 +222,7 @@ class SlackNotifier:
                 formatted_started_time = started_at
 
         # Create AWS console link for the service
-        aws_region = crash_info.get('cluster_arn', '').split(':')[3] if crash_info.get('cluster_arn') else 'us-east-1'
+        aws_region = crash_info.get('aws_region', 'us-east-1')
         service_url = f"https://{aws_region}.console.aws.amazon.com/ecs/v2/clusters/{crash_info['cluster_name']}/services/{crash_info['service_name']}/health"
 
         crash_count = int(aggregation.get('crash_count', 1)) if aggregation else 1
@@ -284,27 +360,30 @@ class SlackNotifier:
         safe_service_name = "".join(c for c in service_name if c.isalnum() or c in (' ', '-', '_')).strip()
         filename = f"{safe_service_name}_{task_id}_logs.txt"
         
-        # Create file content
-        file_content = self._create_log_file_content(crash_info)
-        
+        # Create file content as bytes — the byte length is needed for step 1
+        # and the same bytes are what step 2 uploads.
+        file_bytes = self._create_log_file_content(crash_info)
+
         # Step 1: Get upload URL using files.getUploadURLExternal
         upload_url_endpoint = "https://slack.com/api/files.getUploadURLExternal"
         headers = {
             "Authorization": f"Bearer {self.bot_token}",
             "Content-Type": "application/x-www-form-urlencoded"
         }
-        
+
         upload_url_payload = {
             "filename": filename,
-            "length": str(len(file_content.encode('utf-8')))
+            "length": str(len(file_bytes))
         }
         
         try:
             # Get upload URL using form data
-            upload_url_response = requests.post(upload_url_endpoint, headers=headers, data=upload_url_payload, timeout=30)
-            upload_url_response.raise_for_status()
-            
-            upload_url_result = upload_url_response.json()
+            upload_url_response = _SESSION.post(upload_url_endpoint, headers=headers, data=upload_url_payload, timeout=30)
+            if not upload_url_response.ok:
+                print(f"❌ Slack HTTP {upload_url_response.status_code} getting upload URL")
+                return False, None
+
+            upload_url_result = _loads(upload_url_response.content)
             
             if not upload_url_result.get("ok"):
                 print(f"❌ Failed to get upload URL: {upload_url_result.get('error', 'Unknown error')}")
@@ -318,8 +397,10 @@ class SlackNotifier:
                 return False, None
             
             # Step 2: Upload file to the URL
-            upload_response = requests.post(upload_url, files={'file': (filename, file_content, 'text/plain')}, timeout=30)
-            upload_response.raise_for_status()
+            upload_response = _SESSION.post(upload_url, files={'file': (filename, file_bytes, 'text/plain')}, timeout=30)
+            if not upload_response.ok:
+                print(f"❌ Slack HTTP {upload_response.status_code} uploading file body")
+                return False, None
             
             # Step 3: Complete the upload using files.completeUploadExternal with blocks
             complete_upload_endpoint = "https://slack.com/api/files.completeUploadExternal"
@@ -339,10 +420,12 @@ class SlackNotifier:
                 "blocks": blocks
             }
             
-            complete_response = requests.post(complete_upload_endpoint, headers=complete_headers, json=complete_upload_payload, timeout=30)
-            complete_response.raise_for_status()
-            
-            complete_result = complete_response.json()
+            complete_response = _SESSION.post(complete_upload_endpoint, headers=complete_headers, data=_dumps(complete_upload_payload), timeout=30)
+            if not complete_response.ok:
+                print(f"❌ Slack HTTP {complete_response.status_code} completing upload")
+                return False, None
+
+            complete_result = _loads(complete_response.content)
             
             if complete_result.get("ok"):
                 print(f"✅ Sent crash notification with blocks and attached log file: {filename}")
@@ -367,31 +450,36 @@ class SlackNotifier:
             print(f"❌ Failed to send message with file {filename}: {e}")
             return False, None
     
-    def _create_log_file_content(self, crash_info: Dict[str, Any]) -> str:
-        """Create the log file content for the crash."""
-        lines = []
-        
+    def _create_log_file_content(self, crash_info: Dict[str, Any]) -> bytes:
+        """Create the log file content for the crash as UTF-8 bytes."""
+        # Write encoded bytes straight into a buffer instead of building a
+        # list of strings, joining, and re-encoding — the buffer is the exact
+        # payload the upload step sends.
+        buf = io.BytesIO()
+
         # Add header with log source information
         log_source = crash_info.get('log_source', 'unknown')
-        print(f"🐛 DEBUG Slack file: log_source from crash_info = '{log_source}'")
-        print(f"🐛 DEBUG Slack file: crash_info keys = {list(crash_info.keys())}")
-        lines.append(f"LOG SOURCE: {log_source.upper()}")
-        lines.append("-" * 80)
-        lines.append("")
-        
+        buf.write(f"LOG SOURCE: {log_source.upper()}\n".encode())
+        buf.write(b"-" * 80 + b"\n\n")
+
         # Add logs if available
         recent_logs = crash_info.get('recent_logs', [])
         if recent_logs:
-            lines.append("CONTAINER LOGS:")
-            lines.append("-" * 80)
-            lines.append("")
-            
+            buf.write(b"CONTAINER LOGS:\n")
+            buf.write(b"-" * 80 + b"\n\n")
+
             for log_entry in recent_logs:
-                # Just show the raw message without timestamp prefix
-                lines.append(log_entry.get('message', ''))
-            
-            lines.append("")
+                # CloudWatch entries are bare strings; remote backends still
+                # provide {'timestamp', 'message'} dicts. Either way, only
+                # the message goes into the file.
+                if isinstance(log_entry, str):
+                    buf.write(log_entry.encode())
+                else:
+                    buf.write(log_entry.get('message', '').encode())
+                buf.write(b"\n")
+
+            buf.write(b"\n")
         else:
-            lines.append("No logs available for this crash.")
-        
-        return "\n".join(lines)
\ No newline at end of file
+            buf.write(b"No logs available for this crash.")
+
+        return buf.getvalue()
\ No newline at end of file
@@ -6,7 +6,7 @@ Run from lambda/crash_notifier/ with:
 """
 
 import importlib
-import json
+import json as jsonlib
 import os
 import sys
 import unittest
@@ -67,6 +67,14 @@ class FakeSlackResponse:
         self._payload = payload
         self.status_code = status
 
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        return jsonlib.dumps(self._payload).encode()
+
     def raise_for_status(self):
         if self.status_code >= 400:
             raise RuntimeError(f"HTTP {self.status_code}")
@@ -91,6 +99,13 @@ class FakeSlack:
         # Optional override: map of URL-substring -> FakeSlackResponse
 
     def __call__(self, url, headers=None, json=None, data=None, files=None, timeout=None):
+        # JSON payloads arrive pre-serialized (data=bytes); decode them so
+        # assertions can keep inspecting the structured payload as "json".
+        if json is None and isinstance(data, (bytes, str)):
+            try:
+                json = jsonlib.loads(data)
+            except ValueError:
+                pass
         self.calls.append({"url": url, "json": json, "data": data, "files": bool(files)})
         if url.endswith("/api/chat.postMessage"):
             self._ts_counter += 1
@@ -149,7 +164,7 @@ class CrashNotifierAggregationTests(unittest.TestCase):
         self.enrich_patcher.start()
 
         self.fake = FakeSlack()
-        self.requests_patcher = patch("slack_notifier.requests.post", side_effect=self.fake)
+        self.requests_patcher = patch("slack_notifier._SESSION.post", side_effect=self.fake)
         self.requests_patcher.start()
 
     def tearDown(self):
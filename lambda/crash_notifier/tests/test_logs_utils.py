@@ -0,0 +1,37 @@
+"""
+Module-hygiene tests for logs_utils.
+
+Run from lambda/crash_notifier/ with:
+    python -m unittest tests.test_logs_utils -v
+"""
+
+import ast
+import os
+import sys
+import unittest
+from collections import Counter
+
+
+# Ensure the parent lambda directory is importable (flat-module layout).
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_LAMBDA_DIR = os.path.dirname(_HERE)
+if _LAMBDA_DIR not in sys.path:
+    sys.path.insert(0, _LAMBDA_DIR)
+
+
+class LogsUtilsModuleTests(unittest.TestCase):
+    # Regression test: the module once contained two back-to-back
+    # `def get_cloudwatch_logs` definitions, with only the second one live.
+    def test_no_duplicate_top_level_definitions(self):
+        with open(os.path.join(_LAMBDA_DIR, "logs_utils.py")) as f:
+            tree = ast.parse(f.read())
+        names = Counter(
+            node.name for node in tree.body if isinstance(node, ast.FunctionDef)
+        )
+        duplicates = [name for name, count in names.items() if count > 1]
+        self.assertEqual(duplicates, [], f"duplicate definitions: {duplicates}")
+        self.assertEqual(names["get_cloudwatch_logs"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,150 +6,463 @@ daily summary to Slack with insights, trends, and statistics.
 """
 
 import json
+import time
 import boto3
 import os
+import threading
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
-from collections import defaultdict, Counter
+from collections import Counter
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Prefer orjson for per-event message parsing and payload serialization
+# (2-5x faster than stdlib json); fall back to stdlib if the layer lacks it.
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+
+class _TokenBucket:
+    """Thread-safe token bucket for client-side API rate limiting."""
+
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity,
+                    self._tokens + (now - self._timestamp) * self._rate,
+                )
+                self._timestamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+# FilterLogEvents is capped at 5 TPS per account/region; the concurrent
+# slice workers share this bucket so their bursts pace themselves instead
+# of turning into ThrottlingException retry storms.
+_FILTER_LIMITER = _TokenBucket(rate=5, capacity=5)
+
+# Module-scope client so warm Lambda invocations skip the credential-chain
+# walk and endpoint resolution, and reuse the pooled connections. Adaptive
+# retry mode adds client-side rate limiting on top of exponential backoff,
+# so a transient ThrottlingException slows the run down instead of
+# aborting it.
+_LOGS_CLIENT = boto3.client('logs', config=Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+))
+
+# Module-scope session so warm Lambda invocations reuse the TLS connection
+# to slack.com instead of re-handshaking per summary. POST must be opted
+# into allowed_methods — urllib3 excludes it by default — or the mounted
+# Retry only covers connection errors and the status_forcelist never fires.
+_SLACK_SESSION = requests.Session()
+_SLACK_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({'POST'}),
+    ),
+))
+
+# Optional S3 cache for the computed analysis, keyed by (cluster, date).
+# EventBridge retries and duplicate deliveries re-run the whole pipeline
+# otherwise; with a bucket configured, a retry reuses the stored result.
+_CACHE_BUCKET = os.environ.get('SUMMARY_CACHE_BUCKET', '')
+_S3_CLIENT = boto3.client('s3') if _CACHE_BUCKET else None
 
 
 class DailySummaryProcessor:
     """Processes crash events and generates daily summaries."""
     
     def __init__(self):
-        self.logs_client = boto3.client('logs')
+        self.logs_client = _LOGS_CLIENT
         self.cluster_name = os.environ.get('CLUSTER_NAME', 'unknown')
         self.log_group_name = f"/aws/ecs/monitoring/{self.cluster_name}/crash-events"
         self.slack_bot_token = os.environ.get('SLACK_BOT_TOKEN')
         self.slack_channel = os.environ.get('SLACK_CHANNEL')
+        # Set when event retrieval errors out mid-stream; a truncated run
+        # still produces a (partial) summary but must never be cached.
+        self.fetch_failed = False
         
-    def get_crash_events_from_last_24_hours(self) -> List[Dict[str, Any]]:
-        """Retrieve all crash events from the last 24 hours."""
+    def _fetch_event_slice(self, start_time: int, end_time: int) -> List[Dict[str, Any]]:
+        """Fetch and parse one time-slice of the crash-event window.
+
+        The paginator handles the empty-page and next-token edge cases that
+        a hand-rolled nextToken loop gets wrong (early termination on pages
+        with no events).
+        """
+        events = []
+        paginator = self.logs_client.get_paginator('filter_log_events')
+        page_iterator = paginator.paginate(
+            logGroupName=self.log_group_name,
+            startTime=start_time,
+            endTime=end_time,
+            # Server-side shape check: only lines that parse as JSON with
+            # the STOPPED-task structure the analysis reads come over the
+            # wire. The EventBridge rule already curates what lands in this
+            # group, so this mainly screens out malformed/partial writes
+            # without paying a Python parse for them.
+            filterPattern='{ $.detail.lastStatus = "STOPPED" }',
+            # Ask for the service max (10k events / 1 MB) per page —
+            # the boto3 default page size means many more round-trips
+            # against the 5 TPS FilterLogEvents quota on a noisy day.
+            PaginationConfig={'PageSize': 10000},
+        )
+
+        # Each iteration step fetches one page from the API, so take a token
+        # before advancing the iterator.
+        pages = iter(page_iterator)
+        while True:
+            _FILTER_LIMITER.acquire()
+            try:
+                page = next(pages)
+            except StopIteration:
+                break
+            for event in page.get('events', []):
+                try:
+                    # Parse the JSON message
+                    message_data = _loads(event['message'])
+                except ValueError:
+                    print(f"Failed to parse log event: {event['message']}")
+                    continue
+                events.append({
+                    'timestamp': event['timestamp'],
+                    'message': message_data
+                })
+        return events
+
+    def get_crash_events_from_last_24_hours(self):
+        """Yield crash events from the last 24 hours.
+
+        The 24-hour window is split into a few sub-ranges queried
+        concurrently — FilterLogEvents serializes badly on a long window, and
+        4 parallel slices stay comfortably under the 5 TPS quota. Slices are
+        yielded as they complete, so peak memory is one slice's events, not
+        the whole day's.
+        """
         try:
             # Calculate last 24 hours
             now = datetime.now(timezone.utc)
             twenty_four_hours_ago = now - timedelta(hours=24)
-            
+
             # Convert to timestamps
             start_time = int(twenty_four_hours_ago.timestamp() * 1000)
             end_time = int(now.timestamp() * 1000)
-            
+
             print(f"Querying crash events from {twenty_four_hours_ago} to {now} (last 24 hours)")
-            
-            # Query CloudWatch logs
-            events = []
-            next_token = None
-            
-            while True:
-                params = {
-                    'logGroupName': self.log_group_name,
-                    'startTime': start_time,
-                    'endTime': end_time,
-                    'filterPattern': '',  # Get all events
-                }
-                
-                if next_token:
-                    params['nextToken'] = next_token
-                
-                try:
-                    response = self.logs_client.filter_log_events(**params)
-                    
-                    for event in response.get('events', []):
-                        try:
-                            # Parse the JSON message
-                            message_data = json.loads(event['message'])
-                            events.append({
-                                'timestamp': event['timestamp'],
-                                'message': message_data,
-                                'ingestion_time': event['ingestionTime']
-                            })
-                        except json.JSONDecodeError:
-                            print(f"Failed to parse log event: {event['message']}")
-                            continue
-                    
-                    next_token = response.get('nextToken')
-                    if not next_token:
-                        break
-                        
-                except Exception as e:
-                    print(f"Error querying CloudWatch logs: {str(e)}")
-                    break
-            
-            print(f"Retrieved {len(events)} crash events from the last 24 hours")
-            return events
-            
+
+            slice_count = 4
+            step = (end_time - start_time) // slice_count
+            bounds = [start_time + i * step for i in range(slice_count)] + [end_time]
+
+            total = 0
+            with ThreadPoolExecutor(max_workers=slice_count) as executor:
+                # endTime is inclusive, so shave 1 ms off every slice but the
+                # last to keep boundary events from being fetched twice.
+                futures = [
+                    executor.submit(
+                        self._fetch_event_slice,
+                        bounds[i],
+                        bounds[i + 1] - 1 if i < slice_count - 1 else bounds[i + 1],
+                    )
+                    for i in range(slice_count)
+                ]
+                for future in futures:
+                    slice_events = future.result()
+                    total += len(slice_events)
+                    yield from slice_events
+
+            print(f"Retrieved {total} crash events from the last 24 hours")
+
         except Exception as e:
+            # Keep streaming what we have, but flag the run so the partial
+            # result is not cached as the day's authoritative analysis.
+            self.fetch_failed = True
             print(f"Error retrieving crash events: {str(e)}")
-            return []
     
-    def analyze_crash_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze crash events and generate insights."""
-        if not events:
-            return {
-                'total_crashes': 0,
-                'services_affected': [],
-                'crash_reasons': {},
-                'hourly_distribution': {},
-                'container_failures': {},
-                'exit_codes': {},
-                'task_definitions': {},
-                'trends': {},
-                'top_issues': []
+    def load_cached_analysis(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Return a previously computed analysis for this cluster/date, if cached."""
+        if _S3_CLIENT is None:
+            return None
+        try:
+            obj = _S3_CLIENT.get_object(
+                Bucket=_CACHE_BUCKET,
+                Key=f"{self.cluster_name}/{date_str}.json",
+            )
+            analysis = _loads(obj['Body'].read())
+            # JSON round-trips the hour buckets as strings
+            analysis['hourly_distribution'] = {
+                int(hour): count
+                for hour, count in analysis.get('hourly_distribution', {}).items()
             }
-        
-        # Initialize analysis containers
-        services = set()
-        crash_reasons = Counter()
-        hourly_crashes = defaultdict(int)
+            print(f"✅ Reusing cached analysis for {date_str}")
+            return analysis
+        except _S3_CLIENT.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            print(f"Error reading cached analysis: {str(e)}")
+            return None
+
+    def store_cached_analysis(self, date_str: str, analysis: Dict[str, Any]) -> None:
+        """Persist the computed analysis so retries can skip the pipeline."""
+        if _S3_CLIENT is None:
+            return
+        try:
+            _S3_CLIENT.put_object(
+                Bucket=_CACHE_BUCKET,
+                Key=f"{self.cluster_name}/{date_str}.json",
+                Body=json.dumps(analysis).encode(),
+                ContentType='application/json',
+            )
+        except Exception as e:
+            print(f"Error storing cached analysis: {str(e)}")
+
+    def _run_insights_query(self, query: str, start_time: int, end_time: int) -> Optional[List[Dict[str, str]]]:
+        """Run a single Logs Insights query and poll it to completion.
+
+        Returns rows as {field: value} dicts, or None on failure/timeout.
+        """
+        try:
+            start = self.logs_client.start_query(
+                logGroupName=self.log_group_name,
+                startTime=start_time // 1000,
+                endTime=end_time // 1000,
+                queryString=query,
+            )
+            query_id = start['queryId']
+
+            deadline = time.time() + 25
+            delay = 0.25
+            while True:
+                result = self.logs_client.get_query_results(queryId=query_id)
+                status = result.get('status')
+                if status not in ('Scheduled', 'Running'):
+                    break
+                if time.time() >= deadline:
+                    print(f"Insights query still {status} at deadline, abandoning")
+                    return None
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
+
+            if status != 'Complete':
+                print(f"Insights query finished with status {status}")
+                return None
+
+            return [
+                {f['field']: f['value'] for f in row}
+                for row in result.get('results', [])
+            ]
+
+        except Exception as e:
+            print(f"Error running Insights query: {str(e)}")
+            return None
+
+    def analyze_via_insights(self) -> Optional[Dict[str, Any]]:
+        """Aggregate crash statistics server-side with CloudWatch Logs Insights.
+
+        Runs one `stats count() by ...` query per dimension concurrently, so
+        the raw events never cross the wire and no per-event JSON parsing
+        happens in Python. Returns the same analysis shape as
+        analyze_crash_events, or None if any query fails (the caller then
+        falls back to the event-download pipeline).
+
+        Note: the exit-code/container dimensions read the first container in
+        the task, which is exact for the single-container services this
+        module targets.
+        """
+        now = datetime.now(timezone.utc)
+        start_time = int((now - timedelta(hours=24)).timestamp() * 1000)
+        end_time = int(now.timestamp() * 1000)
+
+        queries = {
+            'reasons': "stats count() as crashes by detail.stoppedReason as reason",
+            'services': "filter detail.group like /^service:/ | stats count() as crashes by detail.group as grp",
+            'hourly': "stats count() as crashes by datefloor(@timestamp, 1h) as hour_bucket",
+            'task_defs': "stats count() as crashes by detail.taskDefinitionArn as task_def",
+            'containers': (
+                "filter ispresent(detail.containers.0.exitCode) and detail.containers.0.exitCode != 0 "
+                "| stats count() as crashes by detail.containers.0.name as container, detail.containers.0.exitCode as exit_code"
+            ),
+        }
+
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            futures = {
+                name: executor.submit(self._run_insights_query, query, start_time, end_time)
+                for name, query in queries.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+        if any(rows is None for rows in results.values()):
+            return None
+
+        crash_reasons = Counter(
+            {row['reason']: int(row['crashes']) for row in results['reasons'] if row.get('reason')}
+        )
+        service_crashes = Counter(
+            {row['grp'][8:]: int(row['crashes']) for row in results['services'] if row.get('grp')}
+        )
+        hourly_crashes = Counter()
+        for row in results['hourly']:
+            bucket = row.get('hour_bucket', '')
+            if bucket:
+                # datefloor returns '2026-04-23 10:00:00.000'
+                hourly_crashes[int(bucket[11:13])] += int(row['crashes'])
+        task_definitions = Counter(
+            {
+                row['task_def'].split('/')[-1]: int(row['crashes'])
+                for row in results['task_defs'] if row.get('task_def')
+            }
+        )
         container_failures = Counter()
         exit_codes = Counter()
-        task_definitions = Counter()
-        service_crashes = Counter()
-        
+        for row in results['containers']:
+            count = int(row['crashes'])
+            container_failures[row.get('container', 'unknown')] += count
+            if row.get('exit_code'):
+                exit_codes[int(float(row['exit_code']))] += count
+
+        total_crashes = sum(crash_reasons.values())
+
+        top_issues = []
+        top_reasons = crash_reasons.most_common(3)
+        if top_reasons:
+            top_issues.append({
+                'type': 'crash_reasons',
+                'title': 'Top Crash Reasons',
+                'items': [f"{reason}: {count} crashes" for reason, count in top_reasons]
+            })
+        top_services = service_crashes.most_common(3)
+        if top_services:
+            top_issues.append({
+                'type': 'affected_services',
+                'title': 'Most Affected Services',
+                'items': [f"{service}: {count} crashes" for service, count in top_services]
+            })
+        top_exit_codes = exit_codes.most_common(3)
+        if top_exit_codes:
+            top_issues.append({
+                'type': 'exit_codes',
+                'title': 'Common Exit Codes',
+                'items': [f"Exit {code}: {count} occurrences" for code, count in top_exit_codes]
+            })
+
+        return {
+            'total_crashes': total_crashes,
+            'services_affected': list(service_crashes),
+            'crash_reasons': dict(crash_reasons),
+            'hourly_distribution': dict(hourly_crashes),
+            'container_failures': dict(container_failures),
+            'exit_codes': dict(exit_codes),
+            'task_definitions': dict(task_definitions),
+            'service_crashes': dict(service_crashes),
+            'top_issues': top_issues
+        }
+
+    def analyze_crash_events(self, events) -> Dict[str, Any]:
+        """Analyze crash events and generate insights.
+
+        Consumes any iterable of events — in particular the generator from
+        get_crash_events_from_last_24_hours — in a single streaming pass.
+        """
+        # Collect each dimension as a flat column while streaming, then count
+        # every column in one C-speed Counter() pass at the end — per-event
+        # `counter[key] += 1` pays a Python-level hash-and-store per field,
+        # which dominates the loop at tens of thousands of events.
+        total_crashes = 0
+        service_col = []
+        reason_col = []
+        hour_col = []
+        container_col = []
+        exit_code_col = []
+        task_def_col = []
+
         for event in events:
             try:
+                total_crashes += 1
                 detail = event['message'].get('detail', {})
-                
-                # Extract service information
-                cluster_arn = detail.get('clusterArn', '')
-                service_name = self._extract_service_name(detail)
-                if service_name:
-                    services.add(service_name)
-                    service_crashes[service_name] += 1
-                
+
+                # Extract service name from group (slice off the 'service:'
+                # prefix) — inlined; a method call per event is measurable
+                # at volume
+                group = detail.get('group', '')
+                if group.startswith('service:'):
+                    service_col.append(group[8:])
+
                 # Extract crash reason
-                stopped_reason = detail.get('stoppedReason', 'Unknown')
-                crash_reasons[stopped_reason] += 1
-                
-                # Hourly distribution
-                timestamp = event['timestamp']
-                dt = datetime.fromtimestamp(timestamp / 1000, timezone.utc)
-                hour = dt.hour
-                hourly_crashes[hour] += 1
-                
-                # Container failures and exit codes
-                containers = detail.get('containers', [])
-                for container in containers:
-                    if container.get('exitCode') is not None and container.get('exitCode') != 0:
-                        container_name = container.get('name', 'unknown')
-                        container_failures[container_name] += 1
-                        exit_code = container.get('exitCode')
-                        exit_codes[exit_code] += 1
-                
+                reason_col.append(detail.get('stoppedReason', 'Unknown'))
+
+                # Hourly distribution — integer math instead of allocating a
+                # datetime per event just to read .hour (epoch ms, UTC)
+                hour_col.append((event['timestamp'] // 3_600_000) % 24)
+
+                # Container failures and exit codes — bind the exit code
+                # once instead of three .get() lookups per container
+                for container in detail.get('containers', []):
+                    exit_code = container.get('exitCode')
+                    if exit_code not in (None, 0):
+                        container_col.append(container.get('name', 'unknown'))
+                        exit_code_col.append(exit_code)
+
                 # Task definition versions
                 task_def_arn = detail.get('taskDefinitionArn', '')
                 if task_def_arn:
-                    task_def_name = task_def_arn.split('/')[-1] if '/' in task_def_arn else task_def_arn
-                    task_definitions[task_def_name] += 1
-                    
+                    task_def_col.append(
+                        task_def_arn.split('/')[-1] if '/' in task_def_arn else task_def_arn
+                    )
+
             except Exception as e:
                 print(f"Error analyzing event: {str(e)}")
                 continue
-        
+
+        service_crashes = Counter(service_col)
+        services = set(service_crashes)
+        crash_reasons = Counter(reason_col)
+        hourly_crashes = Counter(hour_col)
+        container_failures = Counter(container_col)
+        exit_codes = Counter(exit_code_col)
+        task_definitions = Counter(task_def_col)
+
+        if total_crashes == 0:
+            return {
+                'total_crashes': 0,
+                'services_affected': [],
+                'crash_reasons': {},
+                'hourly_distribution': {},
+                'container_failures': {},
+                'exit_codes': {},
+                'task_definitions': {},
+                'trends': {},
+                'top_issues': []
+            }
+
         # Generate top issues
         top_issues = []
-        
+
         # Top crash reasons
         top_reasons = crash_reasons.most_common(3)
         if top_reasons:
@@ -177,28 +490,21 @@ class DailySummaryProcessor:
                 'items': [f"Exit {code}: {count} occurrences" for code, count in top_exit_codes]
             })
         
+        # Counters are dict subclasses and the analysis is consumed (and
+        # JSON-serialized) read-only, so return them as-is instead of
+        # copying every entry into a fresh dict.
         return {
-            'total_crashes': len(events),
+            'total_crashes': total_crashes,
             'services_affected': list(services),
-            'crash_reasons': dict(crash_reasons),
-            'hourly_distribution': dict(hourly_crashes),
-            'container_failures': dict(container_failures),
-            'exit_codes': dict(exit_codes),
-            'task_definitions': dict(task_definitions),
-            'service_crashes': dict(service_crashes),
+            'crash_reasons': crash_reasons,
+            'hourly_distribution': hourly_crashes,
+            'container_failures': container_failures,
+            'exit_codes': exit_codes,
+            'task_definitions': task_definitions,
+            'service_crashes': service_crashes,
             'top_issues': top_issues
         }
     
-    def _extract_service_name(self, detail: Dict[str, Any]) -> Optional[str]:
-        """Extract service name from task detail."""
-        try:
-            group = detail.get('group', '')
-            if group.startswith('service:'):
-                return group.replace('service:', '')
-            return None
-        except Exception:
-            return None
-    
     def create_slack_summary_blocks(self, analysis: Dict[str, Any], date: str) -> List[Dict[str, Any]]:
         """Create Slack blocks for the daily summary."""
         blocks = []
@@ -258,15 +564,15 @@ class DailySummaryProcessor:
             })
             
             for issue in analysis['top_issues']:
-                issue_text = f"*{issue['title']}:*\n"
-                for item in issue['items']:
-                    issue_text += f"• {item}\n"
-                
+                issue_text = f"*{issue['title']}:*\n" + "\n".join(
+                    f"• {item}" for item in issue['items']
+                )
+
                 blocks.append({
                     "type": "section",
                     "text": {
                         "type": "mrkdwn",
-                        "text": issue_text.strip()
+                        "text": issue_text
                     }
                 })
         
@@ -275,16 +581,16 @@ class DailySummaryProcessor:
             blocks.append({
                 "type": "divider"
             })
-            hourly_text = "*🕐 Hourly Distribution (UTC):*\n"
-            sorted_hours = sorted(analysis['hourly_distribution'].items())
-            for hour, count in sorted_hours:
-                hourly_text += f"• {hour:02d}:00 - {count} crash{'es' if count != 1 else ''}\n"
-            
+            hourly_text = "*🕐 Hourly Distribution (UTC):*\n" + "\n".join(
+                f"• {hour:02d}:00 - {count} crash{'es' if count != 1 else ''}"
+                for hour, count in sorted(analysis['hourly_distribution'].items())
+            )
+
             blocks.append({
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": hourly_text.strip()
+                    "text": hourly_text
                 }
             })
         
@@ -293,16 +599,24 @@ class DailySummaryProcessor:
             blocks.append({
                 "type": "divider"
             })
-            services_text = "*🔧 Affected Services:*\n"
-            for service in sorted(analysis['services_affected']):
-                crash_count = analysis['service_crashes'].get(service, 0)
-                services_text += f"• `{service}` - {crash_count} crash{'es' if crash_count != 1 else ''}\n"
-            
+            # Cap the listing — a bad day with hundreds of crashing services
+            # would otherwise blow Slack's 3000-char section limit and fail
+            # the whole post.
+            service_crashes = analysis['service_crashes']
+            affected = sorted(analysis['services_affected'])
+            service_lines = []
+            for service in affected[:20]:
+                count = service_crashes.get(service, 0)
+                service_lines.append(f"• `{service}` - {count} crash{'es' if count != 1 else ''}")
+            if len(affected) > 20:
+                service_lines.append(f"...and {len(affected) - 20} more")
+            services_text = "*🔧 Affected Services:*\n" + "\n".join(service_lines)
+
             blocks.append({
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": services_text.strip()
+                    "text": services_text
                 }
             })
         
@@ -336,11 +650,14 @@ class DailySummaryProcessor:
             "blocks": blocks,
             "text": f"Daily Crash Summary - {self.cluster_name}"  # Fallback text
         }
-        
+
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            # The session's mounted Retry (with POST explicitly allowed)
+            # backs off on throttled/5xx responses and honors Retry-After,
+            # so one transient error doesn't lose the day's summary.
+            response = _SLACK_SESSION.post(url, headers=headers, data=_dumps(payload), timeout=30)
             response.raise_for_status()
-            
+
             result = response.json()
             if result.get("ok"):
                 print("✅ Daily summary sent to Slack successfully!")
@@ -368,14 +685,37 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         now = datetime.now(timezone.utc)
         date_str = now.strftime('%Y-%m-%d')
         
-        # Retrieve crash events
-        print("📊 Retrieving crash events from CloudWatch...")
-        events = processor.get_crash_events_from_last_24_hours()
-        
-        # Analyze events
-        print("🔍 Analyzing crash patterns...")
-        analysis = processor.analyze_crash_events(events)
-        
+        # A cached analysis (EventBridge retry, duplicate delivery) skips
+        # the whole retrieval/aggregation pipeline.
+        cached = processor.load_cached_analysis(date_str)
+        analysis = cached
+
+        # Prefer server-side aggregation via Logs Insights when enabled —
+        # the raw events never have to be downloaded and parsed in Python.
+        if analysis is None and os.environ.get('USE_LOGS_INSIGHTS', '').lower() == 'true':
+            print("📊 Aggregating crash events via Logs Insights...")
+            analysis = processor.analyze_via_insights()
+            if analysis is None:
+                print("⚠️ Insights aggregation failed, falling back to event download")
+
+        if analysis is None:
+            # Retrieve crash events
+            print("📊 Retrieving crash events from CloudWatch...")
+            events = processor.get_crash_events_from_last_24_hours()
+
+            # Analyze events
+            print("🔍 Analyzing crash patterns...")
+            analysis = processor.analyze_crash_events(events)
+
+        # Only cache a cleanly computed analysis — a slice failure during
+        # retrieval would otherwise pin a truncated (or empty) result for
+        # every retry of the day.
+        if cached is None and not processor.fetch_failed:
+            processor.store_cached_analysis(date_str, analysis)
+        elif processor.fetch_failed:
+            print("⚠️ Event retrieval was incomplete, skipping analysis cache")
+
+
         # Create Slack summary
         print("📝 Creating Slack summary...")
         blocks = processor.create_slack_summary_blocks(analysis, date_str)
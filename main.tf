@@ -142,6 +142,7 @@ module "crash_notifier_lambda" {
     ALERT_STATE_TABLE                = aws_dynamodb_table.crash_alert_state[0].name
     AGGREGATION_WINDOW_MINUTES       = tostring(var.crash_alert_aggregation_window_minutes)
     CRASH_ALERT_MODE                 = var.crash_alert_mode
+    SLACK_PREWARM_CONNECTION         = var.crash_notifier_prewarm_slack_connection
   }
 
   cloudwatch_logs_retention_in_days = var.log_retention_days
@@ -156,7 +157,10 @@ module "crash_notifier_lambda" {
         "logs:PutLogEvents",
         "logs:DescribeLogGroups",
         "logs:DescribeLogStreams",
-        "logs:FilterLogEvents"
+        "logs:FilterLogEvents",
+        "logs:GetLogEvents",
+        "logs:StartQuery",
+        "logs:GetQueryResults"
       ],
       resources = [
         "arn:aws:logs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:*"
@@ -268,30 +272,49 @@ module "daily_summary_lambda" {
   vpc_security_group_ids = var.enable_vpc_config ? var.vpc_security_group_ids : null
 
   environment_variables = {
-    SLACK_BOT_TOKEN = var.slack_bot_token
-    SLACK_CHANNEL   = var.daily_summary_slack_channel != "" ? var.daily_summary_slack_channel : var.crash_notifier_slack_channel
-    CLUSTER_NAME    = var.cluster_name
+    SLACK_BOT_TOKEN      = var.slack_bot_token
+    SLACK_CHANNEL        = var.daily_summary_slack_channel != "" ? var.daily_summary_slack_channel : var.crash_notifier_slack_channel
+    CLUSTER_NAME         = var.cluster_name
+    USE_LOGS_INSIGHTS    = var.daily_summary_use_logs_insights
+    SUMMARY_CACHE_BUCKET = var.daily_summary_cache_bucket
   }
 
   cloudwatch_logs_retention_in_days = var.log_retention_days
 
   attach_policy_statements = true
-  policy_statements = {
-    logs = {
-      effect = "Allow",
-      actions = [
-        "logs:CreateLogGroup",
-        "logs:CreateLogStream",
-        "logs:PutLogEvents",
-        "logs:DescribeLogGroups",
-        "logs:DescribeLogStreams",
-        "logs:FilterLogEvents"
-      ],
-      resources = [
-        "arn:aws:logs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:*"
-      ]
-    }
-  }
+  policy_statements = merge(
+    {
+      logs = {
+        effect = "Allow",
+        actions = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents",
+          "logs:DescribeLogGroups",
+          "logs:DescribeLogStreams",
+          "logs:FilterLogEvents",
+          "logs:StartQuery",
+          "logs:GetQueryResults"
+        ],
+        resources = [
+          "arn:aws:logs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:*"
+        ]
+      }
+    },
+    # Scoped to the cluster's key prefix in the (pre-existing) cache bucket
+    var.daily_summary_cache_bucket != "" ? {
+      s3_cache = {
+        effect = "Allow",
+        actions = [
+          "s3:GetObject",
+          "s3:PutObject"
+        ],
+        resources = [
+          "arn:aws:s3:::${var.daily_summary_cache_bucket}/${var.cluster_name}/*"
+        ]
+      }
+    } : {}
+  )
 
   tags = {
     Name        = var.daily_summary_function_name != "" ? var.daily_summary_function_name : "${var.cluster_name}-daily-summary"
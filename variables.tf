@@ -45,6 +45,12 @@ variable "crash_notifier_function_name" {
   default     = ""
 }
 
+variable "crash_notifier_prewarm_slack_connection" {
+  description = "Whether the crash notifier opens its TLS connection to Slack during Lambda init so the first notification skips the handshake"
+  type        = bool
+  default     = false
+}
+
 variable "crash_alert_aggregation_window_minutes" {
   description = "Sliding window in minutes used to aggregate repeat crashes of the same service into a single Slack parent message"
   type        = number
@@ -160,6 +166,18 @@ variable "daily_summary_schedule" {
   default     = "cron(0 9 * * ? *)"
 }
 
+variable "daily_summary_cache_bucket" {
+  description = "Name of an existing S3 bucket used to cache the computed daily analysis so EventBridge retries skip the retrieval pipeline (empty disables the cache)"
+  type        = string
+  default     = ""
+}
+
+variable "daily_summary_use_logs_insights" {
+  description = "Whether the daily summary aggregates crash events with CloudWatch Logs Insights instead of streaming FilterLogEvents pages (billed per GB scanned)"
+  type        = bool
+  default     = false
+}
+
 # ============================================================================
 # Logs Anomalies Configuration
 # ============================================================================